@@ -30,7 +30,12 @@ from pulp.apis.core import LpSolver, PulpSolverError
 
 
 class CPSAT_PY(LpSolver):
-    """The OR-Tools CP-SAT solver"""
+    """
+    The OR-Tools CP-SAT solver
+
+    The CP-SAT variables are available (after a solve) in var.solverVar
+    and the CpModel is in prob.solverModel
+    """
 
     name: str = "CPSAT_PY"
 
@@ -54,8 +59,7 @@ class CPSAT_PY(LpSolver):
         def isSatProblem(lp):
             """Checks if the problem is a SAT problem"""
             # TODO: Z3 also has this--should we hoist it?
-            names = set(var.name for var in lp.objective.keys()) - {'__dummy'}
-            return len(names) == 0
+            return not any(var.name != "__dummy" for var in lp.objective)
         
         def __init__(
             self,
@@ -78,14 +82,13 @@ class CPSAT_PY(LpSolver):
             lp.cpSatSolver = solver
             lp.solverStatus = solver.Solve(lp.solverModel)
 
-        def buildSolverModel(self, lp):
+        def buildSolverModel(self, lp, variables, constraints):
             lp.solverModel = cp_model.CpModel()
-            lp.modelVars = {}
 
             # Create the variables
-            for var in lp.variables():
+            for var in variables:
                 if var.cat == constants.LpInteger:
-                    lp.modelVars[var.name] = lp.solverModel.NewIntVar(var.lowBound, var.upBound, var.name)
+                    var.solverVar = lp.solverModel.NewIntVar(var.lowBound, var.upBound, var.name)
                 elif var.cat == constants.LpContinuous:
                     if var.name != "__dummy":
                         raise ValueError(f"CPSAT_PY: Continuous variables are not supported")
@@ -93,36 +96,53 @@ class CPSAT_PY(LpSolver):
                     raise ValueError(f"CPSAT_PY: Variable type {var.cat} not supported")
             
             # Create the constraints
-            for constraint in lp.constraints.values():
-                constr = self.buildConstraint(lp, constraint)
-                lp.solverModel.Add(constr)
+            for constraint in constraints:
+                self.addConstraint(
+                    lp,
+                    list(constraint.keys()),
+                    list(constraint.values()),
+                    constraint.sense,
+                    -constraint.constant,
+                )
 
             # Add the objective
             if not self.isSatProblem(lp):
-                expr = self.buildLinearExpr(lp, lp.objective)
+                expr = self.buildLinearExpr(
+                    list(lp.objective.keys()), list(lp.objective.values())
+                )
                 if lp.sense == constants.LpMaximize:
                     lp.solverModel.Maximize(expr)
                 else:
                     lp.solverModel.Minimize(expr)
 
-        def buildLinearExpr(self, lp, constraint):
-            expr = []
-            for v, coefficient in constraint.items():
-                expr.append(coefficient * lp.modelVars[v.name])
-            return sum(expr)
+        def buildLinearExpr(self, variables, coefficients):
+            return cp_model.LinearExpr.WeightedSum(
+                [v.solverVar for v in variables], coefficients
+            )
         
-        def buildConstraint(self, lp, constraint):
-            expr = self.buildLinearExpr(lp, constraint)
-            rhs = -constraint.constant
-            if constraint.sense == constants.LpConstraintEQ:
-                constr = expr == rhs
-            elif constraint.sense == constants.LpConstraintLE:
-                constr = expr <= rhs
+        @staticmethod
+        def toInteger(value):
+            """returns an integral number as an int, CP-SAT only accepts integers"""
+            if int(value) != value:
+                raise ValueError(
+                    f"CPSAT_PY: Floating point constants are not supported: {value}"
+                )
+            return int(value)
+
+        def addConstraint(self, lp, variables, coefficients, sense, rhs):
+            """adds the constraint to the model as one bounded linear expression"""
+            rhs = self.toInteger(rhs)
+            coefficients = [self.toInteger(c) for c in coefficients]
+            if sense == constants.LpConstraintEQ:
+                lb, ub = rhs, rhs
+            elif sense == constants.LpConstraintLE:
+                lb, ub = cp_model.INT_MIN, rhs
             else:
-                constr = expr >= rhs
-            return constr
+                lb, ub = rhs, cp_model.INT_MAX
+            expr = self.buildLinearExpr(variables, coefficients)
+            return lp.solverModel.AddLinearConstraint(expr, lb, ub)
 
-        def findSolutionValues(self, lp):
+        def findSolutionValues(self, lp, variables):
             statusMap = {
                 cp_model.FEASIBLE: constants.LpStatusOptimal,
                 cp_model.INFEASIBLE: constants.LpStatusInfeasible,
@@ -131,22 +151,25 @@ class CPSAT_PY(LpSolver):
                 cp_model.UNKNOWN: constants.LpStatusUndefined,
             }
             if lp.solverStatus == cp_model.OPTIMAL:
-                for var in lp.variables():
+                for var in variables:
                     if var.name != "__dummy":
-                        var.varValue = lp.cpSatSolver.Value(lp.modelVars[var.name])
+                        var.varValue = lp.cpSatSolver.Value(var.solverVar)
             return statusMap[lp.solverStatus]
         
         def actualSolve(self, lp):
-            self.buildSolverModel(lp)
+            variables = lp.variables()
+            constraints = list(lp.constraints.values())
+
+            self.buildSolverModel(lp, variables, constraints)
             self.callSolver(lp)
 
-            solutionStatus = self.findSolutionValues(lp)
+            solutionStatus = self.findSolutionValues(lp, variables)
 
-            for var in lp.variables():
+            for var in variables:
                 var.modified = False
 
-            for constraint in lp.constraints.values():
-                constraint.modifier = False
+            for constraint in constraints:
+                constraint.modified = False
 
             return solutionStatus
         
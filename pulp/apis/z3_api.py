@@ -23,6 +23,8 @@
 # Implemented by Ethan Lew (@EthanJamesLew on Github)
 # Users would need to install Z3 and the Python bindings (z3-solver on PyPI) on their machine and provide the path to the executable.
 # More instructions on: https://github.com/Z3Prover/z3
+import fractions
+import math
 import pathlib
 
 from pulp import constants
@@ -33,15 +35,23 @@ class Z3Model:
     """z3 objects for a lp model"""
     def __init__(
             self, 
-            timeout: int,
+            timeout: float,
             logPath: str,
         ) -> None:
-        self.constraints = []
         self.variables = {}
-        self.solver = None 
+        # integer variables encoded as bit-vectors holding var - lowBound,
+        # mapped to (lowBound, upBound - lowBound, bit width)
+        self.bitVecs = {}
+        # z3 constants of the coefficients, keyed by (coefficient, isReal)
+        self.coefficients = {}
+        # the solver remembers the declarations of every script it parsed
+        self.smt2Declared = False
+        # pushing moves z3 to its incremental solver, so only resolves do it
+        self.scoped = False
         self.model = None
         self.timeout = timeout
         self.logPath = logPath
+        self.solver = self.getSolver()
 
     def addVariable(self, variable):
         """add a variable to the model"""
@@ -49,8 +59,12 @@ class Z3Model:
 
     def addConstraint(self, constraint):
         """add a constraint to the model"""
-        self.constraints.append(constraint)
+        self.solver.add(constraint)
         
+    def addSmt2(self, text):
+        """add the assertions of an SMT-LIB2 script to the model"""
+        self.solver.from_string(text)
+
     def getVariable(self, name):
         """get variable from its identifier"""
         return self.variables[name]
@@ -59,18 +73,26 @@ class Z3Model:
         """return a configured Z3 solver"""
         solver = z3.Solver()
         if self.timeout is not None:
-            solver.set("timeout", self.timeout)
+            # z3 reads the timeout in milliseconds
+            solver.set("timeout", int(self.timeout * 1000))
         if self.logPath is not None:
             logPath = pathlib.Path(self.logPath)
             solver.set("smtlib2_log", str(logPath / "z3.smt2"))
             solver.set("proof.log", str(logPath / "z3.proof"))
         return solver
     
+    def push(self):
+        """open a scope whose constraints can later be retracted with pop"""
+        self.solver.push()
+        self.scoped = True
+
+    def pop(self):
+        """retract the constraints added since the matching push"""
+        self.solver.pop()
+
     def solve(self):
         """run the Z3 solver"""
-        self.solver = self.getSolver() 
-        for constraint in self.constraints:
-            self.solver.add(constraint)
+        self.model = None
         status = self.solver.check()
         if status.r > 0:
             self.model = self.solver.model()
@@ -95,7 +117,12 @@ class Z3Model:
 
 
 class Z3_PY(LpSolver):
-    """The Z3 solver"""
+    """
+    The Z3 solver
+
+    The Z3 variables are available (after a solve) in var.solverVar
+    and the Z3Model is in prob.solverModel
+    """
 
     name: str = "Z3_PY"
 
@@ -118,8 +145,9 @@ class Z3_PY(LpSolver):
         @staticmethod
         def isSatProblem(lp):
             """Checks if the problem is a SAT problem"""
-            names = set(var.name for var in lp.objective.keys()) - {'__dummy'}
-            return len(names) == 0
+            if lp.objective is None:
+                return True
+            return not any(var.name != "__dummy" for var in lp.objective)
         
         def __init__(
             self,
@@ -128,9 +156,24 @@ class Z3_PY(LpSolver):
             timeLimit=None,
             warmStart=False,
             logPath=None,
+            smt2Threshold=10000,
+            bitVec=False,
             **solverParams,
         ):
+            """
+            :param bool mip: has no effect, z3 always keeps the integer variables
+            :param bool msg: has no effect, z3 shows no log
+            :param float timeLimit: maximum time for solver (in seconds)
+            :param str logPath: directory where z3 writes its SMT-LIB2 and proof logs
+            :param int smt2Threshold: number of constraints from which the model is
+                passed to z3 as one SMT-LIB2 script
+            :param bool bitVec: if True, integer variables with a range below 2**16
+                are encoded as bit-vectors, which is faster on clause-like models
+                of binary variables and slower on most others
+            """
             self.logPath = logPath
+            self.smt2Threshold = smt2Threshold
+            self.bitVec = bitVec
             super().__init__(mip, msg, timeLimit=timeLimit, **solverParams)
 
         def available(self):
@@ -140,60 +183,380 @@ class Z3_PY(LpSolver):
         def callSolver(self, lp):
             lp.solverModel.solve()
 
-        def buildSolverModel(self, lp):
+        def buildSolverModel(self, lp, variables, constraints, scoped=False):
             # if an object is specified, warn the user that it is not supported
             if not self.isSatProblem(lp):
                 import warnings
                 warnings.warn("Z3_PY: Objective has terms. Z3 supports only SAT problems.")
 
             lp.solverModel = Z3Model(self.timeLimit, self.logPath)
-            for var in lp.variables():
-                if var.cat == constants.LpInteger:
-                    z3Var = z3.Int(var.name)
-                elif var.cat == constants.LpContinuous:
-                    z3Var = z3.Real(var.name)
-                else:
+            # create the variables of each category in one batch
+            categories = {constants.LpInteger: [], constants.LpContinuous: []}
+            for var in variables:
+                if var.cat not in categories:
                     raise ValueError(f"Z3: Variable type {var.cat} not supported")
-                lp.solverModel.addVariable(z3Var)
-                # can we do bounds better than this?
-                lp.solverModel.addConstraint(z3Var >= var.lowBound)
-                lp.solverModel.addConstraint(z3Var <= var.upBound)
-                
-            for constraint in lp.constraints.values():
-                expr = []
-                for v, coefficient in constraint.items():
-                    expr.append(coefficient * lp.solverModel.getVariable(v.name))
-
-                rhs = -constraint.constant
-                if constraint.sense == constants.LpConstraintEQ:
-                    constr = sum(expr) == rhs
-                elif constraint.sense == constants.LpConstraintLE:
-                    constr = sum(expr) <= rhs
+                categories[var.cat].append(var)
+            bitVecVars = []
+            intVars = []
+            for var in categories[constants.LpInteger]:
+                size = self.bitVecSize(var) if self.bitVec else None
+                if size is None:
+                    intVars.append(var)
                 else:
-                    constr = sum(expr) >= rhs
+                    width = max(1, size.bit_length())
+                    lp.solverModel.bitVecs[var] = (int(var.lowBound), size, width)
+                    bitVecVars.append(var)
+            realVars = categories[constants.LpContinuous]
+            z3Vars = (
+                [
+                    z3.BitVec(var.name, lp.solverModel.bitVecs[var][2])
+                    for var in bitVecVars
+                ]
+                + z3.Ints([var.name for var in intVars])
+                + z3.Reals([var.name for var in realVars])
+            )
+            for var, z3Var in zip(bitVecVars + intVars + realVars, z3Vars):
+                var.solverVar = z3Var
+                lp.solverModel.addVariable(z3Var)
+
+            # bit-vectors hold var - lowBound, so only the range can be exceeded
+            bounds = [
+                z3.ULE(var.solverVar, size)
+                for var, (_, size, width) in lp.solverModel.bitVecs.items()
+                if size < 2**width - 1
+            ]
+            bounds += [
+                var.solverVar >= var.lowBound
+                for var in intVars + realVars
+                if var.lowBound is not None
+            ]
+            bounds += [
+                var.solverVar <= var.upBound
+                for var in intVars + realVars
+                if var.upBound is not None
+            ]
+            if bounds:
+                lp.solverModel.addConstraint(z3.And(*bounds))
+
+            if scoped:
+                # constraints get their own scope so a resolve can replace them
+                lp.solverModel.push()
+            self.addConstraints(lp, variables, constraints)
+
+        def addConstraints(self, lp, variables, constraints):
+            """asserts the constraints of the problem in the z3 solver"""
+            if len(constraints) >= self.smt2Threshold and not any(
+                "|" in var.name or "\\" in var.name for var in variables
+            ):
+                # one parse is cheaper than building large models term by term
+                script = self.toSmt2(
+                    lp, variables, constraints, not lp.solverModel.smt2Declared
+                )
+                lp.solverModel.addSmt2(script)
+                lp.solverModel.smt2Declared = True
+                return
+            for constraint in constraints:
+                constr = self.buildConstraint(
+                    lp,
+                    list(constraint.keys()),
+                    list(constraint.values()),
+                    constraint.sense,
+                    -constraint.constant,
+                )
                 lp.solverModel.addConstraint(constr)
 
-        def findSolutionValues(self, lp):
+        @staticmethod
+        def bitVecSize(var):
+            """
+            Returns upBound - lowBound for an integer variable small enough to be
+            encoded as a bit-vector offset from its lower bound, None otherwise
+            """
+            lowBound, upBound = var.lowBound, var.upBound
+            if lowBound is None or upBound is None:
+                return None
+            if int(lowBound) != lowBound or int(upBound) != upBound:
+                return None
+            size = int(upBound) - int(lowBound)
+            if 0 <= size < 2**16:
+                return size
+            return None
+
+        @staticmethod
+        def nonZeroTerms(variables, coefficients):
+            """drops the terms of a constraint with a zero coefficient"""
+            if 0 in coefficients:
+                terms = [(v, c) for v, c in zip(variables, coefficients) if c != 0]
+                variables = [v for v, _ in terms]
+                coefficients = [c for _, c in terms]
+            return variables, coefficients
+
+        @staticmethod
+        def isBitVecConstraint(bitVecs, variables, coefficients):
+            """True if the constraint can be built in bit-vector arithmetic"""
+            return all(v in bitVecs for v in variables) and all(
+                int(c) == c for c in coefficients
+            )
+
+        def buildConstraint(self, lp, variables, coefficients, sense, rhs):
+            """builds the z3 expression of a constraint"""
+            bitVecs = lp.solverModel.bitVecs
+            variables, coefficients = self.nonZeroTerms(variables, coefficients)
+            if self.isBitVecConstraint(bitVecs, variables, coefficients):
+                return self.buildBitVecConstraint(
+                    bitVecs, variables, coefficients, sense, rhs
+                )
+
+            expr = z3.Sum(
+                [
+                    self.buildTerm(lp.solverModel, v, coefficient)
+                    for v, coefficient in zip(variables, coefficients)
+                ]
+            )
+            if sense == constants.LpConstraintEQ:
+                return expr == rhs
+            elif sense == constants.LpConstraintLE:
+                return expr <= rhs
+            else:
+                return expr >= rhs
+
+        @staticmethod
+        def bitVecBounds(bitVecs, variables, coefficients, sense, rhs):
+            """
+            Prepares a constraint over bit-vector variables only.
+
+            The sum is computed in a signed width that can hold every value it can
+            take given the variable ranges, so the modular bit-vector arithmetic
+            never overflows. Returns (width, coefficients, rhs) with the offsets
+            moved to the right hand side, or a bool for constraints the ranges
+            already decide.
+            """
+            coefficients = [int(coefficient) for coefficient in coefficients]
+            low = high = 0
+            for v, coefficient in zip(variables, coefficients):
+                offset, size, _ = bitVecs[v]
+                rhs -= coefficient * offset
+                low += min(0, coefficient * size)
+                high += max(0, coefficient * size)
+            if sense == constants.LpConstraintLE:
+                rhs = math.floor(rhs)
+                if high <= rhs or low > rhs:
+                    return high <= rhs
+            elif sense == constants.LpConstraintGE:
+                rhs = math.ceil(rhs)
+                if low >= rhs or high < rhs:
+                    return low >= rhs
+            elif rhs != int(rhs) or not low <= rhs <= high:
+                return False
+            elif low == high:
+                return True
+            width = max(low.bit_length(), high.bit_length()) + 1
+            return width, coefficients, int(rhs)
+
+        def buildBitVecConstraint(self, bitVecs, variables, coefficients, sense, rhs):
+            """builds a constraint over bit-vector variables only"""
+            bounds = self.bitVecBounds(bitVecs, variables, coefficients, sense, rhs)
+            if isinstance(bounds, bool):
+                return z3.BoolVal(bounds)
+            width, coefficients, rhs = bounds
+
+            expr = []
+            for v, coefficient in zip(variables, coefficients):
+                z3Var = z3.ZeroExt(width - bitVecs[v][2], v.solverVar)
+                if coefficient == 1:
+                    expr.append(z3Var)
+                elif coefficient == -1:
+                    expr.append(-z3Var)
+                else:
+                    expr.append(z3.BitVecVal(coefficient, width) * z3Var)
+            expr = z3.Sum(expr)
+            rhs = z3.BitVecVal(rhs, width)
+            # comparisons of bit-vectors are signed
+            if sense == constants.LpConstraintEQ:
+                return expr == rhs
+            elif sense == constants.LpConstraintLE:
+                return expr <= rhs
+            else:
+                return expr >= rhs
+
+        def buildTerm(self, model, v, coefficient):
+            """builds coefficient * v, reusing one z3 constant per coefficient"""
+            bitVecs = model.bitVecs
+            z3Var = v.solverVar
+            if v in bitVecs:
+                z3Var = z3.BV2Int(z3Var) + bitVecs[v][0]
+            if coefficient == 1:
+                return z3Var
+            if coefficient == -1:
+                return -z3Var
+            isReal = v.cat != constants.LpInteger or not isinstance(coefficient, int)
+            key = (coefficient, isReal)
+            constant = model.coefficients.get(key)
+            if constant is None:
+                if isReal:
+                    constant = z3.RealVal(coefficient)
+                else:
+                    constant = z3.IntVal(coefficient)
+                model.coefficients[key] = constant
+            return constant * z3Var
+
+        def toSmt2(self, lp, variables, constraints, declare=True):
+            """writes the variables and constraints as an SMT-LIB2 script"""
+            bitVecs = lp.solverModel.bitVecs
+            script = []
+            for var in variables if declare else ():
+                if var in bitVecs:
+                    sort = f"(_ BitVec {bitVecs[var][2]})"
+                elif var.cat == constants.LpInteger:
+                    sort = "Int"
+                else:
+                    sort = "Real"
+                script.append(f"(declare-const |{var.name}| {sort})")
+            for constraint in constraints:
+                constr = self.smt2Constraint(
+                    bitVecs,
+                    list(constraint.keys()),
+                    list(constraint.values()),
+                    constraint.sense,
+                    -constraint.constant,
+                )
+                script.append(f"(assert {constr})")
+            return "\n".join(script)
+
+        def smt2Constraint(self, bitVecs, variables, coefficients, sense, rhs):
+            """writes a constraint as an SMT-LIB2 term, as buildConstraint builds it"""
+            variables, coefficients = self.nonZeroTerms(variables, coefficients)
+            if self.isBitVecConstraint(bitVecs, variables, coefficients):
+                bounds = self.bitVecBounds(bitVecs, variables, coefficients, sense, rhs)
+                if isinstance(bounds, bool):
+                    return "true" if bounds else "false"
+                width, coefficients, rhs = bounds
+                modulus = 2**width
+                terms = []
+                for v, coefficient in zip(variables, coefficients):
+                    term = f"((_ zero_extend {width - bitVecs[v][2]}) |{v.name}|)"
+                    if coefficient == -1:
+                        term = f"(bvneg {term})"
+                    elif coefficient != 1:
+                        term = f"(bvmul (_ bv{coefficient % modulus} {width}) {term})"
+                    terms.append(term)
+                expr = terms[0] if len(terms) == 1 else f"(bvadd {' '.join(terms)})"
+                rhs = f"(_ bv{rhs % modulus} {width})"
+                operators = {
+                    constants.LpConstraintEQ: "=",
+                    constants.LpConstraintLE: "bvsle",
+                    constants.LpConstraintGE: "bvsge",
+                }
+                return f"({operators[sense]} {expr} {rhs})"
+
+            isReal = (
+                any(v.cat != constants.LpInteger for v in variables)
+                or any(int(c) != c for c in coefficients)
+                or int(rhs) != rhs
+            )
+            terms = []
+            for v, coefficient in zip(variables, coefficients):
+                term = f"|{v.name}|"
+                if v in bitVecs:
+                    offset = self.smt2Number(bitVecs[v][0], False)
+                    term = f"(+ (bv2int {term}) {offset})"
+                if isReal and v.cat == constants.LpInteger:
+                    term = f"(to_real {term})"
+                if coefficient == -1:
+                    term = f"(- {term})"
+                elif coefficient != 1:
+                    term = f"(* {self.smt2Number(coefficient, isReal)} {term})"
+                terms.append(term)
+            if not terms:
+                expr = self.smt2Number(0, isReal)
+            elif len(terms) == 1:
+                expr = terms[0]
+            else:
+                expr = f"(+ {' '.join(terms)})"
+            operators = {
+                constants.LpConstraintEQ: "=",
+                constants.LpConstraintLE: "<=",
+                constants.LpConstraintGE: ">=",
+            }
+            return f"({operators[sense]} {expr} {self.smt2Number(rhs, isReal)})"
+
+        @staticmethod
+        def smt2Number(value, isReal):
+            """writes a number as an SMT-LIB2 Int or Real literal"""
+            if isReal:
+                # parse the decimal text, as z3.RealVal does
+                value = fractions.Fraction(str(value))
+                text = f"{abs(value.numerator)}.0"
+                if value.denominator != 1:
+                    text = f"(/ {text} {value.denominator}.0)"
+            else:
+                text = str(abs(int(value)))
+            return f"(- {text})" if value < 0 else text
+
+        def findSolutionValues(self, lp, variables):
             if lp.solverModel.status != constants.LpStatusOptimal:
                 return lp.solverModel.status
             else:
-                for var in lp.variables():
-                    var.varValue = lp.solverModel.model[lp.solverModel.getVariable(var.name)]
+                model = lp.solverModel.model
+                bitVecs = lp.solverModel.bitVecs
+                values = [
+                    model.eval(var.solverVar, model_completion=True)
+                    for var in variables
+                ]
+                for var, value in zip(variables, values):
+                    if var in bitVecs:
+                        var.varValue = bitVecs[var][0] + value.as_long()
+                    elif var.cat == constants.LpInteger:
+                        var.varValue = value.as_long()
+                    else:
+                        var.varValue = float(value.as_fraction())
                 return constants.LpStatusOptimal
-        
+
         def actualSolve(self, lp):
-            self.buildSolverModel(lp)
+            variables = lp.variables()
+            constraints = list(lp.constraints.values())
+
+            self.buildSolverModel(lp, variables, constraints)
             self.callSolver(lp)
 
-            solutionStatus = self.findSolutionValues(lp)
+            solutionStatus = self.findSolutionValues(lp, variables)
 
-            for var in lp.variables():
+            for var in variables:
                 var.modified = False
 
-            for constraint in lp.constraints.values():
-                constraint.modifier = False
+            for constraint in constraints:
+                constraint.modified = False
 
+            lp.resolveOK = True
             return solutionStatus
-        
+
         def actualResolve(self, lp, **kwargs):
-            raise PulpSolverError("Z3: Resolving is not supported")
+            """
+            Resolves the problem with the z3 solver of the previous solve
+
+            The variables and their bounds stay asserted and only the constraints
+            are replaced, so z3 keeps what it learned about the rest of the model.
+            The first resolve rebuilds the model with the constraints in their own
+            scope. New variables or changed bounds need a new model.
+            """
+            variables = lp.variables()
+            if any(
+                var.modified or var.name not in lp.solverModel.variables
+                for var in variables
+            ):
+                return self.actualSolve(lp)
+            constraints = list(lp.constraints.values())
+
+            if lp.solverModel.scoped:
+                lp.solverModel.pop()
+                lp.solverModel.push()
+                self.addConstraints(lp, variables, constraints)
+            else:
+                self.buildSolverModel(lp, variables, constraints, scoped=True)
+            self.callSolver(lp)
+
+            solutionStatus = self.findSolutionValues(lp, variables)
+
+            for constraint in constraints:
+                constraint.modified = False
+
+            return solutionStatus
@@ -1,6 +1,6 @@
 import unittest
 import pulp
-from pulp.tests import test_pulp, test_examples
+from pulp.tests import test_pulp, test_examples, test_z3, test_cpsat
 
 
 def pulpTestAll(test_docs=False):
@@ -19,6 +19,8 @@ def get_test_suite(test_docs=False):
     # we get suite with all PuLP tests
     pulp_solver_tests = loader.loadTestsFromModule(test_pulp)
     suite_all.addTests(pulp_solver_tests)
+    suite_all.addTests(loader.loadTestsFromModule(test_z3))
+    suite_all.addTests(loader.loadTestsFromModule(test_cpsat))
     # We add examples and docs tests
     if test_docs:
         docs_examples = loader.loadTestsFromTestCase(test_examples.Examples_DocsTests)
@@ -0,0 +1,70 @@
+"""
+Tests for the CPSAT_PY models
+"""
+
+import unittest
+
+from pulp import LpVariable, LpProblem, CPSAT_PY
+from pulp import constants as const
+
+
+class CPSATTest(unittest.TestCase):
+    def setUp(self):
+        self.solver = CPSAT_PY(msg=False)
+        if not self.solver.available():
+            self.skipTest("solver CPSAT_PY not available")
+
+    def test_senses(self):
+        prob = LpProblem("senses", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        y = LpVariable("y", -5, 5, const.LpInteger)
+        prob += x + y <= 3, "le"
+        prob += x - y >= 7, "ge"
+        prob += x + 2 * y == 1, "eq"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusOptimal)
+        self.assertEqual((x.varValue, y.varValue), (5, -2))
+
+    def test_integral_floats(self):
+        prob = LpProblem("floats", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        y = LpVariable("y", 0, 10, const.LpInteger)
+        prob += 2.0 * x + y <= 4.0, "le"
+        prob += x + 3.0 * y >= 7.0, "ge"
+        prob += x - y == -1.0, "eq"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusOptimal)
+        self.assertEqual((x.varValue, y.varValue), (1, 2))
+
+    def test_fractional_coefficient(self):
+        prob = LpProblem("fractional", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        prob += 0.5 * x <= 2, "le"
+        with self.assertRaisesRegex(ValueError, "Floating point constants"):
+            prob.solve(self.solver)
+
+    def test_fractional_rhs(self):
+        prob = LpProblem("fractional", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        prob += x <= 2.5, "le"
+        with self.assertRaisesRegex(ValueError, "Floating point constants"):
+            prob.solve(self.solver)
+
+    def test_maximize(self):
+        prob = LpProblem("maximize", const.LpMaximize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        y = LpVariable("y", 0, 10, const.LpInteger)
+        prob += 3 * x + 2 * y
+        prob += x + y <= 8, "c1"
+        prob += x - y <= 2, "c2"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusOptimal)
+        self.assertEqual((x.varValue, y.varValue), (5, 3))
+        self.assertEqual(prob.objective.value(), 21)
+
+    def test_infeasible(self):
+        prob = LpProblem("infeasible", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        prob += x >= 11, "ge"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusInfeasible)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Tests for the Z3_PY model encodings and resolves
+"""
+
+import itertools
+import random
+import unittest
+import warnings
+
+from pulp import LpVariable, LpProblem, lpSum, Z3_PY
+from pulp import constants as const
+
+
+def randomProblem(rng):
+    """a small integer problem with mixed signs, float constants and fixed variables"""
+    prob = LpProblem("random", const.LpMinimize)
+    variables = []
+    for i in range(rng.randint(1, 3)):
+        lowBound = rng.randint(-5, 3)
+        upBound = lowBound + rng.randint(0, 6)
+        if rng.random() < 0.1:
+            lowBound = float(lowBound)
+        variables.append(LpVariable(f"v{i}", lowBound, upBound, const.LpInteger))
+    for j in range(rng.randint(1, 3)):
+        expr = lpSum(rng.choice([0, 1, -1, 2, -3, 7, 2.0, 0.5]) * v for v in variables)
+        rhs = rng.randint(-15, 15) + rng.choice([0, 0.5])
+        sense = rng.choice(["le", "ge", "eq"])
+        if sense == "le":
+            prob += expr <= rhs, f"c{j}"
+        elif sense == "ge":
+            prob += expr >= rhs, f"c{j}"
+        else:
+            prob += expr == rhs, f"c{j}"
+    return prob, variables
+
+
+def isFeasible(prob, variables):
+    """checks by enumeration if the problem has a solution"""
+    domains = [range(int(v.lowBound), int(v.upBound) + 1) for v in variables]
+    for point in itertools.product(*domains):
+        for v, value in zip(variables, point):
+            v.varValue = value
+        if all(c.valid(0) for c in prob.constraints.values()):
+            return True
+    return False
+
+
+class Z3Test(unittest.TestCase):
+    solverParams = {}
+
+    def setUp(self):
+        self.solver = Z3_PY(msg=False, **self.solverParams)
+        if not self.solver.available():
+            self.skipTest("solver Z3_PY not available")
+
+    def assertSolution(self, prob, status=const.LpStatusOptimal):
+        self.assertEqual(prob.resolve(), status)
+        if status == const.LpStatusOptimal:
+            self.assertTrue(all(c.valid(0) for c in prob.constraints.values()))
+            for v in prob.variables():
+                if v.name == "__dummy":
+                    continue
+                if v.lowBound is not None:
+                    self.assertGreaterEqual(v.varValue, v.lowBound)
+                if v.upBound is not None:
+                    self.assertLessEqual(v.varValue, v.upBound)
+
+    def resolveProblem(self):
+        prob = LpProblem("resolve", const.LpMinimize)
+        x = LpVariable("x", 0, 10, const.LpInteger)
+        y = LpVariable("y", 0, 10, const.LpInteger)
+        prob += x + y >= 4, "a"
+        prob += x - y == 0, "b"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusOptimal)
+        return prob, x, y
+
+    def test_resolve_add_constraint(self):
+        prob, x, y = self.resolveProblem()
+        prob += x >= 7, "c"
+        self.assertSolution(prob)
+        self.assertGreaterEqual(x.varValue, 7)
+        self.assertEqual(x.varValue, y.varValue)
+
+    def test_resolve_remove_constraint(self):
+        prob, x, y = self.resolveProblem()
+        prob += x >= 9, "c"
+        prob += y <= 2, "d"
+        self.assertSolution(prob, const.LpStatusInfeasible)
+        del prob.constraints["b"]
+        self.assertSolution(prob)
+        self.assertGreaterEqual(x.varValue, 9)
+        self.assertLessEqual(y.varValue, 2)
+
+    def test_resolve_infeasible(self):
+        prob, x, y = self.resolveProblem()
+        prob.constraints["a"].changeRHS(30)
+        self.assertSolution(prob, const.LpStatusInfeasible)
+        prob.constraints["a"].changeRHS(12)
+        self.assertSolution(prob)
+        self.assertGreaterEqual(x.varValue + y.varValue, 12)
+
+    def test_resolve_bounds(self):
+        prob, x, y = self.resolveProblem()
+        prob += x >= 9, "c"
+        self.assertSolution(prob)
+        x.bounds(0, 3)
+        self.assertSolution(prob, const.LpStatusInfeasible)
+        x.bounds(0, 10)
+        self.assertSolution(prob)
+        self.assertGreaterEqual(x.varValue, 9)
+
+    def test_resolve_new_variable(self):
+        prob, x, y = self.resolveProblem()
+        prob += x <= 5, "c"
+        self.assertSolution(prob)
+        z = LpVariable("z", 0, 8, const.LpInteger)
+        prob += x + z >= 12, "d"
+        self.assertSolution(prob)
+        self.assertGreaterEqual(z.varValue, 7)
+        prob.constraints["d"].changeRHS(14)
+        self.assertSolution(prob, const.LpStatusInfeasible)
+
+    def test_continuous(self):
+        prob = LpProblem("continuous", const.LpMinimize)
+        a = LpVariable("a", 0, 2.5)
+        b = LpVariable("b")
+        c = LpVariable("c", 0, None, const.LpInteger)
+        prob += a + b >= 3.25, "k1"
+        prob += b - 0.5 * a <= 1, "k2"
+        prob += c - a >= 0.1, "k3"
+        self.assertEqual(prob.solve(self.solver), const.LpStatusOptimal)
+        self.assertTrue(all(con.valid(1e-9) for con in prob.constraints.values()))
+        self.assertIsInstance(a.varValue, float)
+        self.assertIsInstance(c.varValue, int)
+
+    def test_random_against_enumeration(self):
+        rng = random.Random(1)
+        for i in range(60):
+            prob, variables = randomProblem(rng)
+            with self.subTest(problem=i):
+                feasible = isFeasible(prob, variables)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    status = prob.solve(self.solver)
+                if not feasible:
+                    self.assertEqual(status, const.LpStatusInfeasible)
+                    continue
+                self.assertEqual(status, const.LpStatusOptimal)
+                self.assertTrue(all(c.valid(0) for c in prob.constraints.values()))
+                for v in variables:
+                    self.assertTrue(v.lowBound <= v.varValue <= v.upBound)
+
+
+class Z3_SMT2Test(Z3Test):
+    solverParams = dict(smt2Threshold=0)
+
+
+class Z3_BitVecTest(Z3Test):
+    solverParams = dict(bitVec=True)
+
+
+class Z3_BitVecSMT2Test(Z3Test):
+    solverParams = dict(bitVec=True, smt2Threshold=0)
+
+
+if __name__ == "__main__":
+    unittest.main()